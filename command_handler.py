@@ -1,12 +1,106 @@
 import json
 import random
 import re
-import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 import session_manager
 
+# Chat message format: [HH:MM:SS] [Server thread/INFO]: <username> message
+_CHAT_MARKER = "/INFO]: <"
+# Shortest possible chat line: "[00:00:00] [/INFO]: <a> b"
+_MIN_CHAT_LINE_LEN = 25
+# Endings of the console lines logged when a player logs in or out
+_JOIN_LEAVE_SUFFIXES = (" joined the game", " left the game")
+
+# Numeric forms accepted for a gamble multiplier, e.g. 2, 1.5, .5
+_MULTIPLIER_RE = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+
+# Valid Minecraft usernames only use these characters, which never need JSON escaping
+_SAFE_NAME_RE = re.compile(r"\A[A-Za-z0-9_]{1,16}\Z")
+
+# __FIELD__ placeholders in the pre-serialized tellraw templates
+_PLACEHOLDER_RE = re.compile(r"__([A-Z]+)__")
+
+
+def _parse_chat_line(line):
+    """
+    Split a chat console line into (timestamp, username, message), or None
+
+    Equivalent to matching the pattern
+    \\[(\\d{2}:\\d{2}:\\d{2})\\] \\[.*?/INFO\\]: <([^>]+)> (.+)
+    but done with fixed-offset checks and str.find so no regex engine runs per line.
+    """
+    if (
+        len(line) < _MIN_CHAT_LINE_LEN
+        or line[0] != "["
+        or line[3] != ":"
+        or line[6] != ":"
+        or line[9:12] != "] ["
+        or not (line[1:3] + line[4:6] + line[7:9]).isdecimal()
+    ):
+        return None
+
+    marker = line.find(_CHAT_MARKER, 11)
+    while marker != -1:
+        # The thread name can't span lines
+        if "\n" in line[12:marker]:
+            return None
+        name_start = marker + len(_CHAT_MARKER)
+        name_end = line.find(">", name_start)
+        if name_end == -1:
+            return None
+        message = line[name_end + 2:].partition("\n")[0]
+        if name_end > name_start and line[name_end + 1:name_end + 2] == " " and message:
+            return line[1:9], line[name_start:name_end], message
+        # Like the regex, retry with a later marker inside the thread name
+        marker = line.find(_CHAT_MARKER, marker + 1)
+    return None
+
+
+def _dumps(obj):
+    """Serialize a tellraw payload to a JSON string"""
+    return orjson.dumps(obj).decode()
+
+
+def _safe_name(name):
+    """Return name escaped for a JSON string, skipping the encoder for plain usernames"""
+    if _SAFE_NAME_RE.match(name):
+        return name
+    return _dumps(name)[1:-1]
+
+
+def _template(obj):
+    """Serialize a tellraw payload once, split at its placeholders into (leading text, ((field, following text), ...))"""
+    pieces = _PLACEHOLDER_RE.split(_dumps(obj))
+    return pieces[0], tuple(zip([name.lower() for name in pieces[1::2]], pieces[2::2]))
+
+
+def _render(template, **fields):
+    """Join a template's literal pieces with the JSON-escaped field values"""
+    head, rest = template
+    out = [head]
+    for name, literal in rest:
+        out.append(_safe_name(fields[name]))
+        out.append(literal)
+    return "".join(out)
+
+
+def _user_msg(username, msg, color):
+    """Serialize a "[user] message" reply, the message changes per call so there's nothing to pre-build"""
+    return _dumps(
+        {
+            "text": "",
+            "extra": [
+                {"text": f"[{username}] ", "color": "gray"},
+                {"text": msg, "color": color, "bold": True},
+            ],
+        }
+    )
+
 
 class CommandHandler:
     """Handles chat commands from players"""
@@ -16,18 +110,19 @@ class CommandHandler:
         Initialize command handler
 
         Args:
-            send_command_func: Function to send commands to the server
+            send_command_func: Function to send a command, or a list of commands, to the server
         """
         self.send_command = send_command_func
-        self.commands = {}
+        self._valid_commands = frozenset()
 
         # Load admin list from file
         self.admins = self.load_admins()
 
-        # Chat message pattern: [HH:MM:SS] [Server thread/INFO]: <username> message
-        self.chat_pattern = re.compile(
-            r"\[(\d{2}:\d{2}:\d{2})\] \[.*?/INFO\]: <([^>]+)> (.+)"
-        )
+        # The checked out commit can't change while we're running
+        self._git_hash = self.read_git_hash()
+
+        # (monotonic time of last check, is_weekend), refreshed at most once a minute
+        self._weekend_cache = (float("-inf"), False)
 
         # Gambling configuration
         self.gambling_config = {
@@ -42,44 +137,280 @@ class CommandHandler:
                 {"m": 10.00, "p": 0.09},
             ],
         }
+        # Own generator so gambles don't contend on the module-level random lock
+        self._rng = random.Random()
+        self._mult_lookup = {
+            round(mult["m"], 2): mult for mult in self.gambling_config["multipliers"]
+        }
+        self._valid_multipliers_str = ", ".join(
+            [str(m["m"]) for m in self.gambling_config["multipliers"]]
+        )
         # Register default commands
         self._register_commands()
+        self._build_templates()
 
     def load_admins(self):
-        """Load admin usernames from JSON file"""
+        """Load admin usernames from JSON file as a frozenset for O(1) lookups"""
         admin_file = Path("admins.json")
         if admin_file.exists():
             try:
                 with open(admin_file, "r") as f:
                     data = json.load(f)
-                    admins = data.get("admins", [])
-                    print(f"[ADMIN] Loaded {len(admins)} admin(s): {', '.join(admins)}")
+                    admins = frozenset(data.get("admins", []))
+                    print(f"[ADMIN] Loaded {len(admins)} admin(s): {', '.join(sorted(admins))}")
                     return admins
             except Exception as e:
                 print(f"[ERROR] Failed to load admins.json: {e}")
-                return []
+                return frozenset()
         else:
             print("[WARNING] admins.json not found. No admins configured.")
-            return []
+            return frozenset()
+
+    def read_git_hash(self):
+        """Read the short hash of the checked out commit straight from .git"""
+        git_dir = Path(__file__).parent / ".git"
+        try:
+            head = (git_dir / "HEAD").read_text().strip()
+            if head.startswith("ref: "):
+                ref = head[len("ref: "):]
+                ref_file = git_dir / ref
+                if ref_file.exists():
+                    head = ref_file.read_text().strip()
+                else:
+                    # Ref has been packed by git gc
+                    head = ""
+                    for entry in (git_dir / "packed-refs").read_text().splitlines():
+                        if entry.endswith(" " + ref):
+                            head = entry.split(" ", 1)[0]
+                            break
+            return head[:7] or None
+        except OSError:
+            return None
+        except Exception as e:
+            print(f"[ERROR] Failed to read git hash: {e}")
+            return None
 
     def _register_commands(self):
-        """Register available commands"""
-        self.commands = {
-            "help": self.cmd_help,
-            "playtime": self.cmd_playtime,
-            "rollover": self.cmd_rollover,
-            "stats": self.cmd_stats,
-            'rules': self.cmd_rules,
-            'gamble': self.cmd_gamble,
-            'gambaodds': self.cmd_gambaodds,
+        """Register available commands, each !name is dispatched to cmd_<name>"""
+        self._valid_commands = frozenset({
+            "help",
+            "playtime",
+            "rollover",
+            "stats",
+            "rules",
+            "gamble",
+            "gambaodds",
             # Admin commands
-            "unban": self.cmd_unban,
-            "addtime": self.cmd_addtime,
-            "resettime": self.cmd_resettime,
-            "adminhelp": self.cmd_adminhelp,
-            "version": self.cmd_version,
+            "unban",
+            "addtime",
+            "resettime",
+            "adminhelp",
+            "version",
+        })
+        print(f"[COMMANDS] Registered {len(self._valid_commands)} commands")
+
+    def _build_templates(self):
+        """Serialize the static tellraw payloads once so commands only splice in the username"""
+        # The command set is fixed after registration, so both help listings are too
+        non_admin_cmds = [
+            "help",
+            "playtime",
+            "rollover",
+            "stats",
+            "rules",
+            "version",
+            "gamble",
+            "gambaodds",
+        ]
+        self._stats_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[__USER__] ", "color": "gray"},
+                    {"text": "Server Stats: ", "color": "white"},
+                    {"text": "__ONLINE__ online", "color": "green", "bold": True},
+                    {"text": ", ", "color": "white"},
+                    {"text": "__TOTAL__ total tracked", "color": "aqua"},
+                    {"text": ", ", "color": "white"},
+                    {"text": "__BANNED__ banned", "color": "red", "bold": True},
+                    {"text": ", ", "color": "white"},
+                    {"text": "__AVERAGE__h avg playtime", "color": "gold"},
+                ],
+            }
+        )
+
+        self._help_admin_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[__USER__] ", "color": "gray"},
+                    {"text": "Available commands (Admin commands included): ", "color": "white"},
+                    {
+                        "text": ", ".join([f"!{cmd}" for cmd in sorted(self._valid_commands)]),
+                        "color": "aqua",
+                        "bold": True,
+                    },
+                ],
+            }
+        )
+        self._help_user_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[__USER__] ", "color": "gray"},
+                    {"text": "Available commands: ", "color": "white"},
+                    {
+                        "text": ", ".join([f"!{cmd}" for cmd in sorted(non_admin_cmds)]),
+                        "color": "aqua",
+                        "bold": True,
+                    },
+                ],
+            }
+        )
+
+        self._rules_weekend_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[__USER__] ", "color": "gray"},
+                    {"text": "Weekend Mode Active! ", "color": "green", "bold": True},
+                    {"text": "Unlimited playtime. ", "color": "aqua"},
+                    {"text": "Weekday limit: ", "color": "white"},
+                    {"text": "3 hours ", "color": "gold", "bold": True},
+                    {"text": "(unused time rolls over)", "color": "yellow"},
+                ],
+            }
+        )
+        self._rules_weekday_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[__USER__] ", "color": "gray"},
+                    {"text": "Weekday Rules: ", "color": "yellow", "bold": True},
+                    {"text": "3 hour daily limit. ", "color": "gold"},
+                    {"text": "Unused time rolls over. ", "color": "aqua"},
+                    {"text": "Weekends have ", "color": "white"},
+                    {"text": "unlimited playtime!", "color": "green", "bold": True},
+                ],
+            }
+        )
+        self._adminhelp_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[ADMIN __USER__] ", "color": "red"},
+                    {"text": "Admin commands: ", "color": "white"},
+                    {"text": "!unban <player>", "color": "gold"},
+                    {"text": ", ", "color": "white"},
+                    {"text": "!addtime <player> <minutes>", "color": "gold"},
+                    {"text": ", ", "color": "white"},
+                    {"text": "!resettime <player>", "color": "gold"},
+                ],
+            }
+        )
+
+        # Gamble usage hint - only the remaining time at the end changes per call
+        usage_json = {
+            "text": "",
+            "extra": [
+                {"text": "[__USER__] ", "color": "gray"},
+                {"text": "Usage: !gamble <minutes> <multiplier>", "color": "white"},
+                {"text": "\nAvailable multipliers: ", "color": "yellow"},
+            ],
         }
-        print(f"[COMMANDS] Registered {len(self.commands)} commands")
+        for i, mult in enumerate(self.gambling_config["multipliers"]):
+            if i > 0:
+                usage_json["extra"].append({"text": ", ", "color": "white"})
+            usage_json["extra"].append(
+                {"text": f"{mult['m']}x ({mult['p'] * 100:.1f}%)", "color": "gold"}
+            )
+        usage_json["extra"].append({"text": "__REMAINING__", "color": "aqua"})
+        self._gamble_usage_tmpl = _template(usage_json)
+
+        # Gambling odds are fixed for the lifetime of the handler
+        odds_json = {
+            "text": "",
+            "extra": [
+                {"text": "[__USER__] ", "color": "gray"},
+                {"text": "🎲 Gambling Odds 🎲", "color": "gold", "bold": True},
+            ]
+        }
+        for mult in self.gambling_config["multipliers"]:
+            multiplier = mult["m"]
+            probability = mult["p"]
+            win_chance_percent = probability * 100
+
+            odds_json["extra"].extend([
+                {"text": "\n• ", "color": "white"},
+                {"text": f"{multiplier}x", "color": "aqua", "bold": True},
+                {"text": f" - {win_chance_percent:.1f}% chance", "color": "yellow"},
+                {"text": f" (1 in {1/probability:.1f})", "color": "gray"}
+            ])
+        odds_json["extra"].extend([
+            {"text": "\n\n", "color": "white"},
+            {"text": "💡 Tip: ", "color": "green", "bold": True},
+            {"text": "Higher multipliers = lower win chance!", "color": "white"}
+        ])
+        self._gambaodds_tmpl = _template(odds_json)
+
+        # Fixed-shape announcements, only the player names and amounts vary
+        self._unban_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[ADMIN __USER__] ", "color": "red"},
+                    {"text": "Unbanned ", "color": "white"},
+                    {"text": "__TARGET__", "color": "yellow", "bold": True},
+                ],
+            }
+        )
+        self._addtime_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[ADMIN __USER__] ", "color": "red"},
+                    {"text": "__ACTION__ ", "color": "white"},
+                    {"text": "__MINUTES__ minutes", "color": "green", "bold": True},
+                    {"text": " __DIRECTION__ ", "color": "white"},
+                    {"text": "__TARGET__", "color": "yellow", "bold": True},
+                ],
+            }
+        )
+        self._resettime_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[ADMIN __USER__] ", "color": "red"},
+                    {"text": "Reset ", "color": "white"},
+                    {"text": "__TARGET__", "color": "yellow", "bold": True},
+                    {"text": "'s session (full 3 hours restored)", "color": "green"},
+                ],
+            }
+        )
+        self._gamble_won_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[GAMBLE] ", "color": "gold", "bold": True},
+                    {"text": "__USER__ ", "color": "yellow"},
+                    {"text": "WON ", "color": "green", "bold": True},
+                    {"text": "__WINNINGS__ ", "color": "green"},
+                    {"text": "(bet __BET__m at __MULTIPLIER__x)! 🎉", "color": "white"},
+                ],
+            }
+        )
+        self._gamble_lost_tmpl = _template(
+            {
+                "text": "",
+                "extra": [
+                    {"text": "[GAMBLE] ", "color": "gold", "bold": True},
+                    {"text": "__USER__ ", "color": "yellow"},
+                    {"text": "LOST ", "color": "red", "bold": True},
+                    {"text": "__BET__m ", "color": "red"},
+                    {"text": "(bet at __MULTIPLIER__x) 💸", "color": "white"},
+                ],
+            }
+        )
 
     def process_console_line(self, line):
         """
@@ -88,14 +419,17 @@ class CommandHandler:
         Args:
             line: Raw console line from server
         """
-        match = self.chat_pattern.match(line)
-        if match:
-            timestamp, username, message = match.groups()
+        chat = _parse_chat_line(line)
+        if chat:
+            timestamp, username, message = chat
             print(f"[CHAT] {username}: {message}")
 
             # Check if message is a command (starts with !)
             if message.startswith("!"):
                 self.handle_command(username, message)
+        elif line.rstrip().endswith(_JOIN_LEAVE_SUFFIXES):
+            # Let the session tracker see the login/logout now rather than next cycle
+            session_manager.request_cycle()
 
     def handle_command(self, username, message):
         """
@@ -106,19 +440,20 @@ class CommandHandler:
             message: The full message including the ! prefix
         """
         # Parse command and arguments
-        parts = message[1:].split()  # Remove ! and split
+        parts = message[1:].split(None, 1)  # Remove ! and split off the command
         if not parts:
             return
 
         command = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
+        rest = parts[1] if len(parts) > 1 else ""
+        args = rest.split() if rest else []
 
         print(f"[COMMAND] {username} executed: !{command} {' '.join(args)}")
 
         # Execute command if it exists
-        if command in self.commands:
+        if command in self._valid_commands:
             try:
-                self.commands[command](username, args)
+                getattr(self, "cmd_" + command)(username, args)
             except Exception as e:
                 print(f"[ERROR] Command handler error for {command}: {e}")
                 self.send_command(f"tell {username} Error executing command: {str(e)}")
@@ -127,6 +462,15 @@ class CommandHandler:
                 f"tell {username} Unknown command: !{command}. Type !help for available commands."
             )
 
+    def _is_weekend(self):
+        """Check if today is a weekend, re-reading the clock at most every 60 seconds"""
+        checked_at, is_weekend = self._weekend_cache
+        now = time.monotonic()
+        if now - checked_at > 60:
+            is_weekend = datetime.now().weekday() >= 5
+            self._weekend_cache = (now, is_weekend)
+        return is_weekend
+
     def is_admin(self, username):
         """Check if a user is an admin"""
         return username in self.admins
@@ -136,49 +480,17 @@ class CommandHandler:
     def cmd_help(self, username, args):
         """Help command - shows available commands"""
         # Filter out admin commands for non-admins
-        if self.is_admin(username):
-            available_commands = ", ".join(
-                [f"!{cmd}" for cmd in sorted(self.commands.keys())]
-            )
-            extra_msg = " (Admin commands included)"
-        else:
-            non_admin_cmds = [
-                "help",
-                "playtime",
-                "rollover",
-                "stats",
-                "rules",
-                "version",
-                "gamble",
-                "gambaodds",
-            ]
-            available_commands = ", ".join(
-                [f"!{cmd}" for cmd in sorted(non_admin_cmds)]
-            )
-            extra_msg = ""
-
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": f"Available commands{extra_msg}: ", "color": "white"},
-                {"text": available_commands, "color": "aqua", "bold": True},
-            ],
-        }
-        self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
+        tmpl = self._help_admin_tmpl if self.is_admin(username) else self._help_user_tmpl
+        self.send_command(f"tellraw {username} " + _render(tmpl, user=username))
         print(f"[RESPONSE] Sent help response to {username}")
 
     def cmd_playtime(self, username, args):
         """Playtime command - shows remaining playtime for a player"""
-        session_manager.load_sessions()
-        sessions = session_manager.sessions
-
         target_player = args[0] if args else username
+        data = session_manager.get_player(target_player)
 
-        if target_player in sessions:
-            data = sessions[target_player]
-            weekday = datetime.now().weekday()
-            is_weekend = weekday >= 5
+        if data is not None:
+            is_weekend = self._is_weekend()
 
             if is_weekend:
                 msg = (
@@ -189,7 +501,7 @@ class CommandHandler:
                 color = "green"
             else:
                 rollover_time = data.get("rollover_time", 0)
-                total_limit = session_manager.PLAY_LIMIT.total_seconds() + rollover_time
+                total_limit = session_manager.PLAY_LIMIT_SECONDS + rollover_time
                 remaining = total_limit - data["playtime"]
 
                 if remaining <= 0:
@@ -217,26 +529,19 @@ class CommandHandler:
             )
             color = "red"
 
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": msg, "color": color, "bold": True},
-            ],
-        }
-        self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+        self.send_command(
+            "tellraw @a " + _user_msg(username, msg, color)
+        )
         print(f"[RESPONSE] Sent playtime info to {username}")
 
     def cmd_rollover(self, username, args):
         """Rollover command - shows rollover hours for a player"""
-        session_manager.load_sessions()
-        sessions = session_manager.sessions
-
         # Check if querying for another player (if args provided)
         target_player = args[0] if args else username
+        data = session_manager.get_player(target_player)
 
-        if target_player in sessions:
-            rollover_time = sessions[target_player].get("rollover_time", 0)
+        if data is not None:
+            rollover_time = data.get("rollover_time", 0)
             if rollover_time > 0:
                 hours = rollover_time / 3600
                 if target_player == username:
@@ -257,82 +562,51 @@ class CommandHandler:
                 msg = f"No session data found for {target_player}"
             color = "red"
 
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": msg, "color": color, "bold": True},
-            ],
-        }
-        self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+        self.send_command(
+            "tellraw @a " + _user_msg(username, msg, color)
+        )
         print(f"[RESPONSE] Sent rollover info to {username}")
 
     def cmd_stats(self, username, args):
         """Stats command - shows server statistics"""
-        session_manager.load_sessions()
-        sessions = session_manager.sessions
+        sessions = session_manager.get_sessions()
 
         total_players = len(sessions)
-        online_count = sum(1 for s in sessions.values() if s.get("online", False))
-        banned_count = sum(1 for s in sessions.values() if s.get("banned", False))
+        online_count = 0
+        banned_count = 0
+        total_playtime = 0
+        for s in sessions.values():
+            if s.get("online", False):
+                online_count += 1
+            if s.get("banned", False):
+                banned_count += 1
+            total_playtime += s.get("playtime", 0)
 
         # Calculate average playtime
-        total_playtime = sum(s.get("playtime", 0) for s in sessions.values())
         average_hours = (
             (total_playtime / total_players) / 3600 if total_players > 0 else 0
         )
 
-        # Construct a fancy tellraw JSON message
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": "Server Stats: ", "color": "white"},
-                {"text": f"{online_count} online", "color": "green", "bold": True},
-                {"text": ", ", "color": "white"},
-                {"text": f"{total_players} total tracked", "color": "aqua"},
-                {"text": ", ", "color": "white"},
-                {"text": f"{banned_count} banned", "color": "red", "bold": True},
-                {"text": ", ", "color": "white"},
-                {"text": f"{average_hours:.1f}h avg playtime", "color": "gold"},
-            ],
-        }
-
         # Send to everyone
-        self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+        self.send_command(
+            "tellraw @a "
+            + _render(
+                self._stats_tmpl,
+                user=username,
+                online=str(online_count),
+                total=str(total_players),
+                banned=str(banned_count),
+                average=f"{average_hours:.1f}",
+            )
+        )
         print(f"[RESPONSE] Sent stats to {username}")
 
     def cmd_rules(self, username, args):
         """Rules command - shows server playtime rules"""
-        weekday = datetime.now().weekday()
-        is_weekend = weekday >= 5
+        is_weekend = self._is_weekend()
 
-        if is_weekend:
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {"text": "Weekend Mode Active! ", "color": "green", "bold": True},
-                    {"text": "Unlimited playtime. ", "color": "aqua"},
-                    {"text": "Weekday limit: ", "color": "white"},
-                    {"text": "3 hours ", "color": "gold", "bold": True},
-                    {"text": "(unused time rolls over)", "color": "yellow"},
-                ],
-            }
-        else:
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {"text": "Weekday Rules: ", "color": "yellow", "bold": True},
-                    {"text": "3 hour daily limit. ", "color": "gold"},
-                    {"text": "Unused time rolls over. ", "color": "aqua"},
-                    {"text": "Weekends have ", "color": "white"},
-                    {"text": "unlimited playtime!", "color": "green", "bold": True},
-                ],
-            }
-
-        self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+        tmpl = self._rules_weekend_tmpl if is_weekend else self._rules_weekday_tmpl
+        self.send_command("tellraw @a " + _render(tmpl, user=username))
         print(f"[RESPONSE] Sent rules to {username}")
 
     # Admin Commands
@@ -345,19 +619,9 @@ class CommandHandler:
             )
             return
 
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[ADMIN {username}] ", "color": "red"},
-                {"text": "Admin commands: ", "color": "white"},
-                {"text": "!unban <player>", "color": "gold"},
-                {"text": ", ", "color": "white"},
-                {"text": "!addtime <player> <minutes>", "color": "gold"},
-                {"text": ", ", "color": "white"},
-                {"text": "!resettime <player>", "color": "gold"},
-            ],
-        }
-        self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
+        self.send_command(
+            f"tellraw {username} " + _render(self._adminhelp_tmpl, user=username)
+        )
         print(f"[ADMIN] {username} requested admin help")
 
     def cmd_unban(self, username, args):
@@ -374,25 +638,20 @@ class CommandHandler:
 
         target_player = args[0]
 
-        # Load sessions and unban the player
-        session_manager.load_sessions()
-        if target_player in session_manager.sessions:
-            session_manager.sessions[target_player]["banned"] = False
-            session_manager.save_sessions()
+        # Look up the player and unban them
+        sessions = session_manager.get_sessions()
+        if target_player in sessions:
+            sessions[target_player]["banned"] = False
+            session_manager.mark_dirty()
+            session_manager.log_event(target_player, "unban")
 
             # Execute minecraft unban command
             self.send_command(f"pardon {target_player}")
 
             # Announce the unban
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[ADMIN {username}] ", "color": "red"},
-                    {"text": "Unbanned ", "color": "white"},
-                    {"text": target_player, "color": "yellow", "bold": True},
-                ],
-            }
-            self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+            self.send_command(
+                "tellraw @a " + _render(self._unban_tmpl, user=username, target=target_player)
+            )
             print(f"[ADMIN] {username} unbanned {target_player}")
         else:
             self.send_command(
@@ -418,33 +677,33 @@ class CommandHandler:
             self.send_command(f"tell {username} Invalid minutes value. Must be a number.")
             return
 
-        # Load sessions and add time
-        session_manager.load_sessions()
-        if target_player in session_manager.sessions:
-            current_rollover = session_manager.sessions[target_player].get(
+        # Look up the player and add time
+        sessions = session_manager.get_sessions()
+        if target_player in sessions:
+            current_rollover = sessions[target_player].get(
                 "rollover_time", 0
             )
-            session_manager.sessions[target_player]["rollover_time"] = (
+            sessions[target_player]["rollover_time"] = (
                 current_rollover + (minutes_to_add * 60)
             )
-            session_manager.save_sessions()
+            session_manager.mark_dirty()
 
             # Announce the time addition
             wording = ["Added", "to"] if minutes_to_add > 0 else ["Removed", "from"]
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[ADMIN {username}] ", "color": "red"},
-                    {"text": f"{wording[0]} ", "color": "white"},
-                    {"text": f"{minutes_to_add} minutes", "color": "green", "bold": True},
-                    {"text": f" {wording[1]} ", "color": "white"},
-                    {"text": target_player, "color": "yellow", "bold": True},
-                ],
-            }
-            self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+            self.send_command(
+                "tellraw @a "
+                + _render(
+                    self._addtime_tmpl,
+                    user=username,
+                    action=wording[0],
+                    minutes=str(minutes_to_add),
+                    direction=wording[1],
+                    target=target_player,
+                )
+            )
 
             # Notify the target player if they're online
-            if session_manager.sessions[target_player].get("online", False):
+            if sessions[target_player].get("online", False):
                 if minutes_to_add > 0:
                     self.send_command(
                         f"tell {target_player} An admin has granted you {minutes_to_add} extra minutes!"
@@ -474,34 +733,27 @@ class CommandHandler:
 
         target_player = args[0]
 
-        # Load sessions and reset the player
-        session_manager.load_sessions()
-        if target_player in session_manager.sessions:
-            session_manager.sessions[target_player]["playtime"] = 0
-            session_manager.sessions[target_player]["rollover_time"] = 0
-            session_manager.sessions[target_player]["banned"] = False
+        # Look up the player and reset them
+        sessions = session_manager.get_sessions()
+        if target_player in sessions:
+            sessions[target_player]["playtime"] = 0
+            sessions[target_player]["rollover_time"] = 0
+            sessions[target_player]["banned"] = False
             # Reset announcements
-            for k in session_manager.sessions[target_player]["announcements"]:
-                session_manager.sessions[target_player]["announcements"][k] = False
-            session_manager.save_sessions()
+            sessions[target_player]["announcements_mask"] = 0
+            session_manager.mark_dirty()
+            session_manager.log_event(target_player, "unban")
 
             # Unban if needed
             self.send_command(f"pardon {target_player}")
 
             # Announce the reset
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[ADMIN {username}] ", "color": "red"},
-                    {"text": "Reset ", "color": "white"},
-                    {"text": target_player, "color": "yellow", "bold": True},
-                    {"text": "'s session (full 3 hours restored)", "color": "green"},
-                ],
-            }
-            self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+            self.send_command(
+                "tellraw @a " + _render(self._resettime_tmpl, user=username, target=target_player)
+            )
 
             # Notify the target player if they're online
-            if session_manager.sessions[target_player].get("online", False):
+            if sessions[target_player].get("online", False):
                 self.send_command(
                     f"tell {target_player} An admin has reset your session! You now have full playtime available."
                 )
@@ -514,61 +766,31 @@ class CommandHandler:
 
     def cmd_version(self, username, args):
         """Version command - shows the current git hash version of ATTR"""
-        try:
-            # Get the current git hash
-            result = subprocess.run(
-                ["git", "rev-parse", "--short", "HEAD"],
-                capture_output=True,
-                text=True,
-                cwd=Path(__file__).parent,
-            )
-
-            if result.returncode == 0:
-                git_hash = result.stdout.strip()
-                msg = f"ATTR Version: 2.0-{git_hash}"
-                color = "aqua"
-            else:
-                msg = "Version info unavailable (not a git repository)"
-                color = "yellow"
-        except Exception as e:
-            msg = "Version info unavailable"
-            color = "red"
-            print(f"[ERROR] Failed to get git hash: {e}")
+        if self._git_hash:
+            msg = f"ATTR Version: 2.0-{self._git_hash}"
+            color = "aqua"
+        else:
+            msg = "Version info unavailable (not a git repository)"
+            color = "yellow"
 
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": msg, "color": color, "bold": True},
-            ],
-        }
-        self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+        self.send_command(
+            "tellraw @a " + _user_msg(username, msg, color)
+        )
         print(f"[RESPONSE] Sent version info to {username}")
 
     def cmd_gamble(self, username, args):
         """Gamble command - allows players to gamble their remaining playtime"""
         # Check if it's weekend (unlimited playtime)
-        weekday = datetime.now().weekday()
-        is_weekend = weekday >= 5
+        is_weekend = self._is_weekend()
 
         if is_weekend:
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {
-                        "text": "Gambling is disabled on weekends (unlimited playtime)!",
-                        "color": "red",
-                        "bold": True,
-                    },
-                ],
-            }
-            self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
+            self._send_gamble_error(
+                username, "Gambling is disabled on weekends (unlimited playtime)!"
+            )
             return
 
         # Load session data
-        session_manager.load_sessions()
-        sessions = session_manager.sessions
+        sessions = session_manager.get_sessions()
 
         if username not in sessions:
             self.send_command(
@@ -578,80 +800,45 @@ class CommandHandler:
 
         data = sessions[username]
         rollover_time = data.get("rollover_time", 0)
-        total_limit = session_manager.PLAY_LIMIT.total_seconds() + rollover_time
+        total_limit = session_manager.PLAY_LIMIT_SECONDS + rollover_time
         remaining = total_limit - data["playtime"]
 
         # Check if player has at least 5 minutes remaining
         min_time_required = 5 * 60  # 5 minutes in seconds
         if remaining < min_time_required:
             minutes = int(remaining // 60)
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {
-                        "text": f"You need at least 5 minutes remaining to gamble. You have {minutes}m left.",
-                        "color": "red",
-                        "bold": True,
-                    },
-                ],
-            }
-            self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
+            self._send_gamble_error(
+                username,
+                f"You need at least 5 minutes remaining to gamble. You have {minutes}m left.",
+            )
             return
 
         # Parse arguments
         if len(args) < 2:
             # Show gambling options
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {"text": "Usage: !gamble <minutes> <multiplier>", "color": "white"},
-                    {"text": "\nAvailable multipliers: ", "color": "yellow"},
-                ],
-            }
-
-            # Add multiplier options
-            for i, mult in enumerate(self.gambling_config["multipliers"]):
-                if i > 0:
-                    tellraw_json["extra"].append({"text": ", ", "color": "white"})
-                tellraw_json["extra"].append(
-                    {"text": f"{mult['m']}x ({mult['p'] * 100:.1f}%)", "color": "gold"}
-                )
-
-            tellraw_json["extra"].append(
-                {
-                    "text": f"\nYou have {int(remaining // 60)}m {int(remaining % 60)}s available",
-                    "color": "aqua",
-                }
+            remaining_text = f"\nYou have {int(remaining // 60)}m {int(remaining % 60)}s available"
+            self.send_command(
+                f"tellraw {username} "
+                + _render(self._gamble_usage_tmpl, user=username, remaining=remaining_text)
             )
-            self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
             return
 
-        try:
-            bet_minutes = int(args[0])
-            multiplier = float(args[1])
-        except ValueError:
+        # Validate up front so malformed input doesn't go through int()/float() exceptions
+        if not args[0].removeprefix("-").isdecimal() or not _MULTIPLIER_RE.fullmatch(args[1]):
             self.send_command(
                 f"tell {username} Invalid arguments. Use: !gamble <minutes> <multiplier>"
             )
             return
+        bet_minutes = int(args[0])
+        multiplier = float(args[1])
 
         # Validate bet amount
         bet_seconds = bet_minutes * 60
         if bet_seconds > remaining:
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": f"[{username}] ", "color": "gray"},
-                    {
-                        "text": f"You can't bet {bet_minutes}m - you only have {int(remaining // 60)}m {int(remaining % 60)}s!",
-                        "color": "red",
-                        "bold": True,
-                    },
-                ],
-            }
-            self.send_command(f"tellraw {username} {json.dumps(tellraw_json)}")
+            self._send_gamble_error(
+                username,
+                f"You can't bet {bet_minutes}m - you only have {int(remaining // 60)}m {int(remaining % 60)}s!",
+            )
             return
 
         if bet_minutes < 2:
@@ -659,24 +846,19 @@ class CommandHandler:
             return
 
         # Find matching multiplier configuration
-        mult_config = None
-        for mult in self.gambling_config["multipliers"]:
-            if abs(mult["m"] - multiplier) < 0.001:  # Float comparison with tolerance
-                mult_config = mult
-                break
+        mult_config = self._mult_lookup.get(round(multiplier, 2))
+        if mult_config is not None and abs(mult_config["m"] - multiplier) >= 0.001:  # Float comparison with tolerance
+            mult_config = None
 
         if mult_config is None:
-            available_mults = ", ".join(
-                [str(m["m"]) for m in self.gambling_config["multipliers"]]
-            )
             self.send_command(
-                f"tell {username} Invalid multiplier! Available: {available_mults}"
+                f"tell {username} Invalid multiplier! Available: {self._valid_multipliers_str}"
             )
             return
 
         # Perform the gamble
         win_chance = mult_config["p"]
-        roll = random.random()
+        roll = self._rng.random()
         won = roll < win_chance
 
         if won:
@@ -685,33 +867,20 @@ class CommandHandler:
             new_rollover = rollover_time + winnings
             sessions[username]["rollover_time"] = new_rollover
 
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": "[GAMBLE] ", "color": "gold", "bold": True},
-                    {"text": f"{username} ", "color": "yellow"},
-                    {"text": "WON ", "color": "green", "bold": True},
-                    {
-                        "text": f"{int(winnings // 60)}m {int(winnings % 60)}s ",
-                        "color": "green",
-                    },
-                    {
-                        "text": f"(bet {bet_minutes}m at {multiplier}x)! 🎉",
-                        "color": "white",
-                    },
-                ],
-            }
-
-            # Show title to the winner
-            self.send_command(
-                f'title {username} title {{"text":"🎉 JACKPOT! 🎉","color":"gold","bold":true}}'
-            )
-            self.send_command(
-                f'title {username} subtitle {{"text":"Won {int(winnings // 60)}m {int(winnings % 60)}s!","color":"green","bold":true}}'
+            won_payload = _render(
+                self._gamble_won_tmpl,
+                user=username,
+                winnings=f"{int(winnings // 60)}m {int(winnings % 60)}s",
+                bet=str(bet_minutes),
+                multiplier=str(multiplier),
             )
 
-            # Send result to everyone
-            self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+            # Show title to the winner and send result to everyone in one batch
+            self.send_command([
+                f'title {username} title {{"text":"🎉 JACKPOT! 🎉","color":"gold","bold":true}}',
+                f'title {username} subtitle {{"text":"Won {int(winnings // 60)}m {int(winnings % 60)}s!","color":"green","bold":true}}',
+                f"tellraw @a {won_payload}",
+            ])
 
             print(
                 f"[GAMBLE] {username} won {winnings / 60:.1f}m betting {bet_minutes}m at {multiplier}x (roll: {roll:.4f}, needed: <{win_chance:.4f})"
@@ -727,65 +896,37 @@ class CommandHandler:
                 loss_from_playtime = bet_seconds - rollover_time
                 sessions[username]["playtime"] += loss_from_playtime
 
-            tellraw_json = {
-                "text": "",
-                "extra": [
-                    {"text": "[GAMBLE] ", "color": "gold", "bold": True},
-                    {"text": f"{username} ", "color": "yellow"},
-                    {"text": "LOST ", "color": "red", "bold": True},
-                    {"text": f"{bet_minutes}m ", "color": "red"},
-                    {"text": f"(bet at {multiplier}x) 💸", "color": "white"},
-                ],
-            }
-
-            # Show title to the loser
-            self.send_command(
-                f'title {username} title {{"text":"💸 BUST! 💸","color":"red","bold":true}}'
-            )
-            self.send_command(
-                f'title {username} subtitle {{"text":"Lost {bet_minutes}m","color":"dark_red","bold":true}}'
+            lost_payload = _render(
+                self._gamble_lost_tmpl,
+                user=username,
+                bet=str(bet_minutes),
+                multiplier=str(multiplier),
             )
 
-            # Send result to everyone
-            self.send_command(f"tellraw @a {json.dumps(tellraw_json)}")
+            # Show title to the loser and send result to everyone in one batch
+            self.send_command([
+                f'title {username} title {{"text":"💸 BUST! 💸","color":"red","bold":true}}',
+                f'title {username} subtitle {{"text":"Lost {bet_minutes}m","color":"dark_red","bold":true}}',
+                f"tellraw @a {lost_payload}",
+            ])
 
             print(
                 f"[GAMBLE] {username} lost {bet_minutes}m betting at {multiplier}x (roll: {roll:.4f}, needed: <{win_chance:.4f})"
             )
 
-        # Save sessions
-        session_manager.save_sessions()
+        # Queue the change for the next autosave
+        session_manager.mark_dirty()
 
         print(f"[RESPONSE] Processed gamble for {username}")
 
+    def _send_gamble_error(self, username, msg):
+        """Tell only the gambler why their gamble was refused"""
+        self.send_command(
+            f"tellraw {username} "
+            + _user_msg(username, msg, "red")
+        )
+
     def cmd_gambaodds(self, username, args):
         """Gambaodds command - shows gambling odds and probabilities"""
-        tellraw_json = {
-            "text": "",
-            "extra": [
-                {"text": f"[{username}] ", "color": "gray"},
-                {"text": "🎲 Gambling Odds 🎲", "color": "gold", "bold": True},
-            ]
-        }
-
-        # Add each multiplier with its odds
-        for mult in self.gambling_config["multipliers"]:
-            multiplier = mult["m"]
-            probability = mult["p"]
-            win_chance_percent = probability * 100
-
-            tellraw_json["extra"].extend([
-                {"text": "\n• ", "color": "white"},
-                {"text": f"{multiplier}x", "color": "aqua", "bold": True},
-                {"text": f" - {win_chance_percent:.1f}% chance", "color": "yellow"},
-                {"text": f" (1 in {1/probability:.1f})", "color": "gray"}
-            ])
-
-        tellraw_json["extra"].extend([
-            {"text": "\n\n", "color": "white"},
-            {"text": "💡 Tip: ", "color": "green", "bold": True},
-            {"text": "Higher multipliers = lower win chance!", "color": "white"}
-        ])
-
-        self.send_command(f'tellraw {username} {json.dumps(tellraw_json)}')
+        self.send_command(f"tellraw {username} " + _render(self._gambaodds_tmpl, user=username))
         print(f"[RESPONSE] Sent gambling odds to {username}")
@@ -1,6 +1,10 @@
 from exaroton import Exaroton
 from dotenv import load_dotenv
+import asyncio
+import atexit
 import os
+import signal
+import sys
 import threading
 import time
 
@@ -13,35 +17,50 @@ exa = Exaroton(os.environ.get("API_KEY"))
 SERVER_NAME = os.environ.get("SERVER_NAME")
 
 
+SERVER_CACHE_TTL = 5  # seconds a fetched server's status and player list are reused
+OFFLINE_POLL_MIN = 60  # seconds between status checks right after the server goes offline
+OFFLINE_POLL_MAX = 300  # cap for the offline status check backoff
+
+_server_ids = {}  # server name -> id, never changes for a running server
+_servers_by_name = {}  # server name -> server object from the last get_servers() call
+_servers_fetched_at = float("-inf")  # monotonic time of the last get_servers() call
+
+
+def _fetch_servers_by_name() -> dict:
+    """Return all servers keyed by name, reusing the last fetch for SERVER_CACHE_TTL seconds."""
+    global _servers_by_name, _servers_fetched_at
+    now = time.monotonic()
+    if now - _servers_fetched_at > SERVER_CACHE_TTL:
+        _servers_by_name = {server.name: server for server in exa.get_servers()}
+        _servers_fetched_at = now
+    return _servers_by_name
+
+
 def get_server_id(server_name: str) -> str:
+    if server_name in _server_ids:
+        return _server_ids[server_name]
     try:
-        servers = exa.get_servers()
-        for server in servers:
-            if server.name == server_name:
-                return server.id
-        return ""
+        server = _fetch_servers_by_name().get(server_name)
+        if server is None:
+            return ""
+        _server_ids[server_name] = server.id
+        return server.id
     except Exception:
         return ""
 
 
 def get_server_online_players(server_name: str) -> list:
     try:
-        servers = exa.get_servers()
-        for server in servers:
-            if server.name == server_name:
-                return server.players.list
-        return []
+        server = _fetch_servers_by_name().get(server_name)
+        return server.players.list if server is not None else []
     except Exception:
         return []
 
 
 def server_is_online(server_name: str) -> bool:
     try:
-        servers = exa.get_servers()
-        for server in servers:
-            if server.name == server_name:
-                return server.status == "Online"
-        return False
+        server = _fetch_servers_by_name().get(server_name)
+        return server is not None and server.status == "Online"
     except Exception:
         return False
 
@@ -75,31 +94,80 @@ def run_command(server_name: str, command: str):
         print(f"Failed to execute command '{command}': {e}")
 
 
-def managed_session_manager(server_name):
+async def managed_session_manager(server_name):
     """
     Wrapper that only runs session manager when the server is online.
-    If server is offline → pause tracking until it comes back.
+    If server is offline → pause tracking until it comes back, polling
+    less often (up to OFFLINE_POLL_MAX) the longer it stays down.
+    The exaroton client is blocking, so its calls run in worker threads.
     """
     last_state = 0 # 0 = offline, 1 = online
+    backoff = OFFLINE_POLL_MIN
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    # Join/leave lines are seen on the websocket thread, hand the wakeup to our loop
+    session_manager.set_wake_handler(lambda: loop.call_soon_threadsafe(wake.set))
     while True:
-        if server_is_online(server_name):
+        if await asyncio.to_thread(server_is_online, server_name):
             last_state = 1
+            backoff = OFFLINE_POLL_MIN
             print(f"[INFO] Server '{server_name}' is online. Session manager active.")
             # send_tell(server_name, None, "ATTR is now watching this server. GLHF (in moderation)")
             try:
-                while server_is_online(server_name):
-                    session_manager.session_cycle(
+                # server_is_online and get_online_players share one cached fetch per cycle
+                woken = False
+                deadline = time.monotonic()  # when the current cycle was due
+                while await asyncio.to_thread(server_is_online, server_name):
+                    wake.clear()
+                    players_online = await asyncio.to_thread(
+                        session_manager.session_cycle,
                         get_online_players=lambda: get_server_online_players(server_name),
                         send_message=lambda player, msg: send_tell(server_name, player, msg),
                         run_command=lambda cmd: run_command(server_name, cmd)
                     )
+                    # Nobody to track, so wait longer unless a join wakes us. Right after
+                    # a wakeup keep the normal interval in case the player list lagged behind
+                    if players_online or woken:
+                        interval = session_manager.CYCLE_INTERVAL
+                    else:
+                        # Banned players can't log in to wake us, so don't sleep through
+                        # midnight and hold up their reset (+1s so the cycle lands after it)
+                        interval = min(
+                            session_manager.IDLE_CYCLE_INTERVAL,
+                            session_manager.seconds_until_midnight() + 1,
+                        )
+                    # Count the interval from when this cycle was due rather than when it
+                    # finished, so API calls and the cycle itself don't stretch the period
+                    deadline += interval
+                    now = time.monotonic()
+                    if deadline < now:
+                        # Fell behind, carry on from now instead of running cycles back to back
+                        deadline = now
+                    try:
+                        await asyncio.wait_for(wake.wait(), deadline - now)
+                        woken = True
+                        deadline = time.monotonic()
+                    except asyncio.TimeoutError:
+                        woken = False
             except Exception as e:
                 print(f"[ERROR] Session manager crashed: {e}")
+            delay = OFFLINE_POLL_MIN
         else:
             if last_state == 1:
                 print(f"[INFO] Server '{server_name}' is offline. Pausing session tracking.")
             last_state = 0
-        time.sleep(60)  # check every 60s if server status changed
+            delay = backoff
+            backoff = min(backoff * 2, OFFLINE_POLL_MAX)
+        await asyncio.sleep(delay)  # wait before checking if server status changed
+
+
+async def main(server_name):
+    """Run session tracking and the autosave flush on one event loop"""
+    await asyncio.gather(
+        managed_session_manager(server_name),
+        # Flush session changes made by chat commands in the background
+        session_manager.autosave_loop(),
+    )
 
 
 if __name__ == "__main__":
@@ -110,13 +178,12 @@ if __name__ == "__main__":
 
     print(f"Monitoring server '{SERVER_NAME}' with ID {server_id}")
 
-    threading.Thread(
-        target=managed_session_manager,
-        args=(SERVER_NAME,),
-        daemon=True
-    ).start()
+    # Sessions live in memory between autosaves, flush them however we exit.
+    # SIGTERM (e.g. from systemd or docker stop) is turned into a normal exit so atexit runs
+    atexit.register(session_manager.save_sessions)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
-    # Start WebSocket console monitor thread
+    # Start WebSocket console monitor thread (websocket-client blocks, so it keeps its own thread)
     threading.Thread(
         target=websocket_console.run_websocket_monitor,
         args=(os.environ.get("API_KEY"), server_id),
@@ -127,5 +194,7 @@ if __name__ == "__main__":
     print("[INFO] Chat command monitoring active. Players can use: !help, !playtime, !rollover, !stats, !rules")
     print("[INFO] Admin commands available: !adminhelp, !unban, !addtime, !settime, !resettime (for authorized admins only)")
 
-    while True:  # placeholder for extra tasks
-        time.sleep(10)
+    try:
+        asyncio.run(main(SERVER_NAME))
+    except KeyboardInterrupt:
+        print("[INFO] Shutting down, saving sessions...")
@@ -1,94 +1,397 @@
+import asyncio
+import logging
+import logging.handlers
+import mmap
+import os
+import sys
+import threading
 import time
-import json
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
+
+import orjson
+
 from constants import MAXIMUM_PLAYTIME_INT, FREEPLAY_DAYS
 
 SESSION_FILE = Path("sessions.json")
+EVENTS_FILE = Path("sessions_events.jsonl")  # ban/unban/login events since the last save
+_MMAP_THRESHOLD = 1 << 20  # session files at least this big are parsed straight from an mmap
 PLAY_LIMIT = timedelta(hours=MAXIMUM_PLAYTIME_INT)  # normal weekday limit
+PLAY_LIMIT_SECONDS = PLAY_LIMIT.total_seconds()
+_BASE_HOURS = int(PLAY_LIMIT_SECONDS // 3600)  # whole hours, for limit messages
+AUTOSAVE_INTERVAL = 30  # seconds between background flushes of pending changes
+CYCLE_INTERVAL = 60  # seconds between session cycles
+DEBUG_MODE = False  # log per-player diagnostics every cycle (checked at the start of each cycle)
+IDLE_CYCLE_INTERVAL = 300  # seconds between session cycles while nobody is online
+
+# (seconds remaining, bit in a session's announcements_mask), checked in ascending order
+_THRESHOLDS = (
+    (60, 1 << 0),  # 1min
+    (300, 1 << 1),  # 5min
+    (600, 1 << 2),  # 10min
+    (900, 1 << 3),  # 15min
+    (1800, 1 << 4),  # 30min
+)
+_MAX_THRESHOLD = _THRESHOLDS[-1][0]  # no warning can fire with more time than this left
+_THRESHOLD_SECONDS = tuple(threshold for threshold, _ in _THRESHOLDS)  # for bisecting
+_ALL_THRESHOLD_BITS = (1 << len(_THRESHOLDS)) - 1  # bit i belongs to _THRESHOLDS[i]
+# Old per-label announcements dict keys, in the same bit order as _THRESHOLDS
+_LEGACY_ANNOUNCEMENT_KEYS = ("1min", "5min", "10min", "15min", "30min")
+
+
+class _BatchedMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that hands its buffered lines to the target's stream in one write"""
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer or self.target is None:
+                return
+            lines = []
+            for record in self.buffer:
+                try:
+                    lines.append(self.target.format(record) + self.target.terminator)
+                except Exception:
+                    self.handleError(record)
+            self.buffer.clear()
+            with self.target.lock:
+                try:
+                    self.target.stream.write("".join(lines))
+                    self.target.flush()
+                except Exception:
+                    self.handleError(record)
+
+
+# Session output is buffered and written once per cycle, warnings and errors go out immediately
+log = logging.getLogger("sessions")
+log.setLevel(logging.DEBUG if DEBUG_MODE else logging.INFO)
+log.propagate = False
+_console = logging.StreamHandler(sys.stdout)
+_console.setFormatter(logging.Formatter("%(message)s"))  # lines carry their own [TAG]
+_log_buffer = _BatchedMemoryHandler(
+    capacity=1000, flushLevel=logging.WARNING, target=_console
+)
+log.addHandler(_log_buffer)
 
 sessions = {}
+_dirty = False  # in-memory sessions have changes that aren't on disk yet
+_loaded = False  # sessions has been read from disk at least once
+_journal_lock = threading.Lock()  # keeps event appends out of a save's snapshot-and-truncate
 unlimited_play_announced = False  # global weekend announcement flag
 first_cycle = True  # Track if this is the first cycle after startup
+_wake_handler = None  # installed by main's cycle scheduler, called by request_cycle()
+# ((year, day of year), today_str, weekday) for the day session_cycle last ran on
+_today = (None, None, None)
+_last_reset_date = None  # today_str once every loaded player has had its daily reset
 
 # If it is saturday or sunday. Change this condition for your own use-case
 def load_sessions():
-    global sessions
-    if SESSION_FILE.exists():
-        with open(SESSION_FILE, "r") as f:
-            sessions = json.load(f)
-    else:
+    """Read sessions from disk into memory, the in-memory copy is authoritative afterwards"""
+    global sessions, _loaded, _last_reset_date
+    if _dirty:
+        # Unsaved in-memory changes are newer than anything on disk
+        return
+    try:
+        with open(SESSION_FILE, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+                # Let orjson read the page cache directly instead of copying a big file into bytes first
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    sessions = orjson.loads(view)
+            else:
+                sessions = orjson.loads(f.read())
+    except FileNotFoundError:
         sessions = {}
+    # Migrate records written by older versions
+    for data in sessions.values():
+        # last_checked and session_start used to be stored as ISO strings, they're POSIX timestamps now
+        for key in ("last_checked", "session_start"):
+            if isinstance(data.get(key), str):
+                data[key] = iso_to_dt(data[key]).timestamp()
+        # announcements used to be a dict of label -> bool, it's a bitmask now
+        legacy = data.pop("announcements", None)
+        if legacy is not None:
+            data["announcements_mask"] = sum(
+                1 << i for i, key in enumerate(_LEGACY_ANNOUNCEMENT_KEYS) if legacy.get(key)
+            )
+    _loaded = True
+    # Freshly read records may be from an earlier day
+    _last_reset_date = None
+    if _replay_events():
+        # Bring the snapshot up to date with the journal on the next save
+        mark_dirty()
+    # May run outside a cycle (e.g. from a chat command), don't hold its lines until the next one
+    _log_buffer.flush()
+
+
+def _replay_events():
+    """Re-apply ban state from events journaled after the last save, returns whether any applied"""
+    try:
+        lines = EVENTS_FILE.read_bytes().splitlines()
+    except FileNotFoundError:
+        return False
+    applied = False
+    for line in lines:
+        try:
+            event = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # A crash mid-append can leave a partial last line
+            continue
+        data = sessions.get(event.get("player"))
+        if data is None or event.get("event") not in ("ban", "unban"):
+            continue
+        data["banned"] = event["event"] == "ban"
+        applied = True
+    if applied:
+        log.info("[INFO] Replayed ban state from %s", EVENTS_FILE)
+    return applied
+
+
+def log_event(player, event, ts=None):
+    """
+    Append a ban/unban/login event to the journal.
+    Call it after changing sessions, so a save that truncates the journal also has the change.
+    """
+    line = orjson.dumps({"ts": time.time() if ts is None else ts, "player": player, "event": event})
+    with _journal_lock, open(EVENTS_FILE, "ab") as f:
+        f.write(line + b"\n")
 
 
 def save_sessions():
-    with open(SESSION_FILE, "w") as f:
-        json.dump(sessions, f, indent=2)
-
-
-def dt_to_iso(dt):
-    return dt.isoformat()
+    """Write sessions to disk if anything changed since the last save"""
+    global _dirty
+    with _journal_lock:
+        if not _dirty:
+            return
+        _dirty = False
+        tmp_file = SESSION_FILE.with_suffix(".json.tmp")
+        try:
+            # Write a temp file and rename it over the real one so a crash mid-write
+            # can't leave a truncated sessions.json behind
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(sessions))
+                f.flush()
+                # Make sure the data is on disk before the rename can be
+                os.fsync(f.fileno())
+            os.replace(tmp_file, SESSION_FILE)
+        except Exception:
+            _dirty = True
+            raise
+        # Every journaled event is part of the snapshot now
+        EVENTS_FILE.unlink(missing_ok=True)
+
+
+def mark_dirty():
+    """Flag the in-memory sessions as changed so the next save writes them"""
+    global _dirty
+    _dirty = True
+
+
+async def autosave_loop(interval=AUTOSAVE_INTERVAL):
+    """Periodically flush pending session changes (runs as a task on main's event loop)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(save_sessions)
+        except Exception as e:
+            log.error("[ERROR] Failed to save sessions: %s", e)
+
+
+def get_sessions():
+    """Return the in-memory sessions, only reading the file on first use"""
+    if not _loaded:
+        load_sessions()
+    return sessions
+
+
+def get_player(name):
+    """Return one player's session record (or None) from the in-memory sessions"""
+    return get_sessions().get(name)
+
+
+def _today_for(now_ts):
+    """Return local (today_str, weekday) for a timestamp, only reformatting when the date changes"""
+    global _today
+    local = time.localtime(now_ts)
+    day = (local.tm_year, local.tm_yday)
+    if day != _today[0]:
+        _today = (day, time.strftime("%Y-%m-%d", local), local.tm_wday)
+    return _today[1], _today[2]
+
+
+def seconds_until_midnight(now_ts=None):
+    """Seconds until the next local midnight, when the daily reset and pardons are due"""
+    if now_ts is None:
+        now_ts = time.time()
+    local = time.localtime(now_ts)
+    # mktime rolls day 32 etc. over into the next month
+    midnight = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return max(0.0, midnight - now_ts)
+
+
+def set_wake_handler(handler):
+    """Install the callback request_cycle() uses to wake the cycle scheduler"""
+    global _wake_handler
+    _wake_handler = handler
+
+
+def request_cycle():
+    """Ask for the next session cycle to run now instead of after the full interval"""
+    if _wake_handler is not None:
+        _wake_handler()
 
 
 def iso_to_dt(iso_str):
     return datetime.fromisoformat(iso_str)
 
 
+@lru_cache(maxsize=256)
+def pretty_time(seconds):
+    """Format whole seconds as e.g. "1h 5m", cached since the warning thresholds repeat"""
+    td = timedelta(seconds=max(0, seconds))
+    parts = []
+    if td.days > 0:
+        parts.append(f"{td.days}d")
+    hours, rem = divmod(td.seconds, 3600)
+    if hours > 0:
+        parts.append(f"{hours}h")
+    minutes, seconds = divmod(rem, 60)
+    if minutes > 0:
+        parts.append(f"{minutes}m")
+    if seconds > 0 and not parts:
+        parts.append(f"{seconds}s")
+    return " ".join(parts) if parts else "0s"
+
+
+def new_session(now_ts, today_str, online):
+    """Build a fresh session record, the one place that defines which keys a record has"""
+    return {
+        "session_start": now_ts,
+        "playtime": 0,
+        "rollover_time": 0,  # unused time from previous days
+        "online": online,
+        "session_date": today_str,
+        "banned": False,
+        "announcements_mask": 0,
+        "last_checked": now_ts,
+    }
+
+
 def initialize_players(player_list):
     """Add players from initial list to sessions."""
-    load_sessions()
-    now_str = dt_to_iso(datetime.now())
-    today_str = datetime.now().date().isoformat()
+    get_sessions()
+    now_ts = time.time()
+    today_str, _ = _today_for(now_ts)
     for player in player_list:
         if player not in sessions:
-            sessions[player] = {
-                "session_start": now_str,
-                "playtime": 0,
-                "rollover_time": 0,  # unused time from previous days
-                "online": True,
-                "session_date": today_str,
-                "banned": False,
-                "announcements": {k: False for k in ["1min", "5min", "10min", "15min", "30min"]}
-            }
+            sessions[player] = new_session(now_ts, today_str, online=True)
+            mark_dirty()
     save_sessions()
 
 
+class OutboundQueue:
+    """Holds back a cycle's broadcast messages so they reach the server as one command"""
+
+    def __init__(self, send_message, run_command):
+        self._send_message = send_message
+        self._run_command = run_command
+        self._broadcasts = []
+
+    def send_message(self, player, msg):
+        """Queue a broadcast (player None), messages to a single player go out right away"""
+        if player is None:
+            self._broadcasts.append(msg)
+        else:
+            self._send_message(player, msg)
+
+    def flush(self):
+        """Send the queued broadcasts, a single one as before and several as one tellraw"""
+        broadcasts, self._broadcasts = self._broadcasts, []
+        if len(broadcasts) == 1:
+            self._send_message(None, broadcasts[0])
+        elif broadcasts:
+            # Same look as the console's say, one line per message
+            text = "\n".join(f"[Server] {msg}" for msg in broadcasts)
+            self._run_command("tellraw @a " + orjson.dumps({"text": text}).decode())
+
+
 def session_cycle(get_online_players=None, send_message=None, run_command=None):
     """
-    One cycle of session management (called repeatedly while server is online).
+    One cycle of session management (called every CYCLE_INTERVAL seconds while server is online).
     Pauses automatically when server is offline because `main` controls execution.
+    Returns whether any players are online, so the caller can idle longer when nobody is.
     """
-    global unlimited_play_announced, first_cycle
-    load_sessions()
+    level = logging.DEBUG if DEBUG_MODE else logging.INFO
+    if log.level != level:
+        log.setLevel(level)
+    outbound = OutboundQueue(send_message, run_command)
+    try:
+        return _session_cycle(get_online_players, outbound.send_message, run_command)
+    finally:
+        # Send whatever was queued even if the cycle failed part way
+        outbound.flush()
+        # One write for the cycle's log lines
+        _log_buffer.flush()
+
+
+def _session_cycle(get_online_players, send_message, run_command):
+    """Body of session_cycle, broadcasts passed to send_message are batched by the caller"""
+    global unlimited_play_announced, first_cycle, _last_reset_date
+    get_sessions()  # only reads the file on the first cycle
 
     # Handle first cycle after program restart
     if first_cycle:
-        now_str = dt_to_iso(datetime.now())
+        restart_ts = time.time()
         for player, data in sessions.items():
             # Reset online status to prevent phantom time from restart
             data["online"] = False
             # Update last_checked to current time to prevent delta issues
-            data["last_checked"] = now_str
+            data["last_checked"] = restart_ts
+        mark_dirty()
         save_sessions()
         first_cycle = False
-    now = datetime.now()
-    today_str = now.date().isoformat()
+    now_ts = time.time()
+    today_str, weekday = _today_for(now_ts)
     online_players = get_online_players()
-    weekday = now.weekday()
+    online_set = frozenset(online_players)
     is_freeplay = FREEPLAY_DAYS[weekday]
 
-    # --- Daily reset for ALL players (including offline ones) ---
+    # --- Handle freeplay unlimited logic ---
+    weekend_ended = False
+    if is_freeplay and not unlimited_play_announced:
+        send_message(None, "Weekend unlimited playtime has started! Enjoy!")
+        run_command("/title @a title {{\"text\":\"Its the weekend! Unlimited Playtime!\",\"color\":\"green\",\"bold\":true}}")
+        unlimited_play_announced = True
+    elif not is_freeplay and unlimited_play_announced:
+        send_message(None, "Weekend unlimited playtime has ended. Weekday limit resumed! Resetting all session times.")
+        run_command("/title @a title {{\"text\":\"Weekend Unlimited Playtime ENDED\",\"color\":\"red\",\"bold\":true}}")
+        unlimited_play_announced = False
+        weekend_ended = True
+
+    # Start tracking players we haven't seen before
+    for player in online_players:
+        if player not in sessions:
+            # Start as offline so first login detection works
+            sessions[player] = new_session(now_ts, today_str, online=False)
+            mark_dirty()
+
+    # --- One pass over ALL players (including offline ones) ---
+    unbanned = []  # announced together after the pass instead of one message each
+    reset_due = _last_reset_date != today_str
     for player, data in sessions.items():
-        player_session_date = data.get("session_date")
-        print(f"[DEBUG] {player}: session_date={player_session_date}, today_str={today_str}, match={player_session_date == today_str}")
-        if data.get("session_date") != today_str:
-            print(f"[DEBUG] Triggering daily reset for {player}")
+        # Daily reset. Once a day's pass is done every record is dated today (new ones
+        # are created that way), so the per-player date check only runs until then
+        if reset_due and data.get("session_date") != today_str:
+            log.debug(
+                "[DEBUG] Triggering daily reset for %s: session_date=%s, today_str=%s",
+                player, data.get("session_date"), today_str,
+            )
             # Calculate unused time and add to rollover (but not on freeplay periods)
-            yesterday_weekday = (now - timedelta(days=1)).weekday()
+            yesterday_weekday = (weekday - 1) % 7
             if yesterday_weekday < 5:  # only rollover from weekdays
                 current_rollover = data.get("rollover_time", 0)
                 yesterday_playtime = data["playtime"]
-                base_limit = PLAY_LIMIT.total_seconds()
+                base_limit = PLAY_LIMIT_SECONDS
 
                 # Calculate how much base time was unused
                 unused_base_time = max(0, base_limit - yesterday_playtime)
@@ -102,7 +405,10 @@ def session_cycle(get_online_players=None, send_message=None, run_command=None):
                     # Plus keep any existing rollover they didn't touch
                     new_rollover = current_rollover + unused_base_time
 
-                print(f"[ROLLOVER] {player}: base_limit={PLAY_LIMIT}, played={timedelta(seconds=yesterday_playtime)}, old_rollover={timedelta(seconds=current_rollover)}")
+                log.info(
+                    "[ROLLOVER] %s: base_limit=%s, played=%s, old_rollover=%s",
+                    player, PLAY_LIMIT, timedelta(seconds=yesterday_playtime), timedelta(seconds=current_rollover),
+                )
 
                 # Clear rollover if today is Saturday (after Friday)
                 if weekday == 5:  # Saturday
@@ -110,14 +416,14 @@ def session_cycle(get_online_players=None, send_message=None, run_command=None):
                     if new_rollover > 0:
                         unused_hours = new_rollover / 3600
                         # Only send message if player is online
-                        if player in online_players:
+                        if player in online_set:
                             send_message(player, f"Note: {unused_hours:.1f} hours of rollover time expired entering the weekend.")
                 else:
                     data["rollover_time"] = new_rollover
-                    print(f"[ROLLOVER UPDATE] {player}: new rollover = {new_rollover/3600:.2f}h")
+                    log.info("[ROLLOVER UPDATE] %s: new rollover = %.2fh", player, new_rollover / 3600)
                     if unused_base_time > 0 or current_rollover != new_rollover:
                         # Only send message if player is online
-                        if player in online_players:
+                        if player in online_set:
                             total_rollover_hours = new_rollover / 3600
                             send_message(player, f"Daily reset: You now have {total_rollover_hours:.1f} hours rollover time available.")
             else:
@@ -125,105 +431,84 @@ def session_cycle(get_online_players=None, send_message=None, run_command=None):
                 data["rollover_time"] = data.get("rollover_time", 0)
 
             # Reset session data for the new day
-            data["session_start"] = dt_to_iso(now)
+            data["session_start"] = now_ts
             data["playtime"] = 0
             data["session_date"] = today_str
-            data["last_checked"] = dt_to_iso(now)
+            data["last_checked"] = now_ts
             data["online"] = False
-            for k in data["announcements"]:
-                data["announcements"][k] = False
+            data["announcements_mask"] = 0
 
             # Unban ALL players on daily reset
             if data.get("banned"):
                 run_command(f"pardon {player}")
                 data["banned"] = False
-                send_message(None, f"{player} has been unbanned for the new day.")
+                log_event(player, "unban", now_ts)
+                unbanned.append(player)
+            mark_dirty()
 
-    # Save sessions after daily reset to preserve rollover calculations
-    print("[DEBUG] Saving sessions after daily reset to preserve rollover calculations")
-    save_sessions()
-
-    # --- Handle freeplay unlimited logic ---
-    if is_freeplay and not unlimited_play_announced:
-        send_message(None, "Weekend unlimited playtime has started! Enjoy!")
-        run_command("/title @a title {{\"text\":\"Its the weekend! Unlimited Playtime!\",\"color\":\"green\",\"bold\":true}}")
-        unlimited_play_announced = True
-    elif not is_freeplay and unlimited_play_announced:
-        send_message(None, "Weekend unlimited playtime has ended. Weekday limit resumed! Resetting all session times.")
-        run_command("/title @a title {{\"text\":\"Weekend Unlimited Playtime ENDED\",\"color\":\"red\",\"bold\":true}}")
-        unlimited_play_announced = False
-
-        # Reset all players for weekday start, but preserve online status to prevent delta issues
-        for player, data in sessions.items():
+        if weekend_ended:
+            # Reset for weekday start, but preserve online status to prevent delta issues
             data["playtime"] = 0
             data["rollover_time"] = 0  # clear rollover when weekend ends
-            data["session_start"] = dt_to_iso(now)
+            data["session_start"] = now_ts
             # Don't set online = False here - preserve current online status to prevent phantom deltas
-            data["last_checked"] = dt_to_iso(now)  # Reset last_checked to now to prevent large deltas
-            data["banned"] = False
+            data["last_checked"] = now_ts  # Reset last_checked to now to prevent large deltas
+            # Only players we banned need a pardon, skip the command for everyone else
+            if data.get("banned"):
+                run_command(f"pardon {player}")
+                data["banned"] = False
+                log_event(player, "unban", now_ts)
             data["session_date"] = today_str
-            for k in data["announcements"]:
-                data["announcements"][k] = False
-            run_command(f"pardon {player}")
+            data["announcements_mask"] = 0
+            mark_dirty()
 
-    # --- Handle player sessions ---
-    # Note: Don't reload sessions here as it would overwrite daily reset changes
-    for player in online_players:
-        if player in sessions:
-            # Daily reset is now handled globally above for all players
-            # Don't set online status here - it will be set after checking was_online
-            pass
-        else:
-            sessions[player] = {
-                "session_start": dt_to_iso(now),
-                "playtime": 0,
-                "rollover_time": 0,
-                "online": False,  # Start as offline so first login detection works
-                "session_date": today_str,
-                "banned": False,
-                "announcements": {k: False for k in ["1min", "5min", "10min", "15min", "30min"]}
-            }
+        if player not in online_set:
+            # Mark offline players
+            if data["online"]:
+                data["online"] = False
+                mark_dirty()
+            continue
 
         # Detect first login (transition from offline to online)
-        was_online = sessions[player].get("online", False)
-        print(f"[DEBUG] {player}: was_online={was_online}, setting online=True")
-        sessions[player]["online"] = True  # Set online status for this cycle
+        was_online = data.get("online", False)
+        log.debug("[DEBUG] %s: was_online=%s, setting online=True", player, was_online)
+        data["online"] = True  # Set online status for this cycle
 
         if was_online:
             # Already online, calculate and update playtime
-            last_checked = iso_to_dt(sessions[player].get("last_checked", dt_to_iso(now)))
-            delta = (now - last_checked).total_seconds()
+            delta = now_ts - data.get("last_checked", now_ts)
 
             # Protect against large deltas (more than 2 minutes suggests timing issues)
             if delta > 120:
-                print(f"[WARNING] Large delta detected for {player}: {delta}s, capping to 60s")
+                log.warning("[WARNING] Large delta detected for %s: %ss, capping to 60s", player, delta)
                 delta = 60
             elif delta < 0:
-                print(f"[WARNING] Negative delta detected for {player}: {delta}s, setting to 0")
+                log.warning("[WARNING] Negative delta detected for %s: %ss, setting to 0", player, delta)
                 delta = 0
 
             # Only check for ban evading on weekdays (weekends have no restrictions)
-            if not is_freeplay and sessions[player]["banned"]:
-                print([f"{player} is BAN EVADING!"])
+            if not is_freeplay and data["banned"]:
+                log.warning("[WARNING] %s is BAN EVADING!", player)
                 run_command(f"ban {player} really? thought you could get away with it that easily?")
             else:
                 # Only add delta if it's reasonable (positive and not too large)
                 if delta > 0:
-                    sessions[player]["playtime"] += delta
+                    data["playtime"] += delta
         else:
             # First login, don't add any delta time
-            print(f"[INFO] {player} logging in for first time today")
+            log.info("[INFO] %s logging in for first time today", player)
+            log_event(player, "login", now_ts)
             if not is_freeplay:
-                rollover_time = sessions[player].get("rollover_time", 0)
-                total_limit = PLAY_LIMIT.total_seconds() + rollover_time
+                rollover_time = data.get("rollover_time", 0)
+                total_limit = PLAY_LIMIT_SECONDS + rollover_time
                 # Ensure playtime is never negative
-                current_playtime = max(0, sessions[player]["playtime"])
-                sessions[player]["playtime"] = current_playtime
+                current_playtime = max(0, data["playtime"])
+                data["playtime"] = current_playtime
                 seconds_remaining = total_limit - current_playtime
-                pretty_time_str = str(timedelta(seconds=int(max(0, seconds_remaining))))
-                if seconds_remaining <= 0 or sessions[player]["banned"] is True:
+                if seconds_remaining <= 0 or data["banned"] is True:
                     send_message(player, "You are not welcome. Please come back tomorrow")
                 else:
+                    pretty_time_str = str(timedelta(seconds=int(seconds_remaining)))
                     welcome_msg = f"Welcome! Playtime tracking has started. You have {pretty_time_str} remaining today."
                     if rollover_time > 0:
                         rollover_hours = rollover_time / 3600
@@ -232,78 +517,75 @@ def session_cycle(get_online_players=None, send_message=None, run_command=None):
             else:
                 send_message(player, "Welcome! Its the weekend, there are currently no playtime restrictions")
 
-        sessions[player]["last_checked"] = dt_to_iso(now)
+        data["last_checked"] = now_ts
+        mark_dirty()
 
-    # Mark offline players
-    for player in list(sessions.keys()):
-        if player not in online_players:
-            sessions[player]["online"] = False
+    _last_reset_date = today_str
+
+    if unbanned:
+        verb = "has" if len(unbanned) == 1 else "have"
+        send_message(None, f"{', '.join(unbanned)} {verb} been unbanned for the new day.")
 
     # --- Enforce weekday limits ---
     if not is_freeplay:
         for player, data in sessions.items():
+            # Nothing below changes rollover, look everything up once per player
             rollover_time = data.get("rollover_time", 0)
-            total_limit = PLAY_LIMIT.total_seconds() + rollover_time
-            remaining = total_limit - data["playtime"]
-            base_hours = PLAY_LIMIT.total_seconds() // 3600
+            total_limit = PLAY_LIMIT_SECONDS + rollover_time
+            playtime = data["playtime"]
+            remaining = total_limit - playtime
             if rollover_time > 0:
-                print(f"[{player}] Base limit: {PLAY_LIMIT}, Rollover: {timedelta(seconds=rollover_time)}, Total limit: {timedelta(seconds=total_limit)}, Time remaining: {timedelta(seconds=max(0, remaining))}")
+                log.debug(
+                    "[%s] Base limit: %s, Rollover: %s, Total limit: %s, Time remaining: %s",
+                    player, PLAY_LIMIT, timedelta(seconds=rollover_time), timedelta(seconds=total_limit),
+                    timedelta(seconds=max(0, remaining)),
+                )
             else:
-                print(f"[{player}] Max playtime: {PLAY_LIMIT}, Time remaining: {timedelta(seconds=max(0, remaining))}")
-            time_limit_text = f"{int(base_hours)}-hour limit" + (f" (+{rollover_time/3600:.1f}h rollover)" if rollover_time > 0 else "")
-
-            def pretty_time(seconds):
-                td = timedelta(seconds=int(max(0, seconds)))
-                parts = []
-                if td.days > 0:
-                    parts.append(f"{td.days}d")
-                hours, rem = divmod(td.seconds, 3600)
-                if hours > 0:
-                    parts.append(f"{hours}h")
-                minutes, seconds = divmod(rem, 60)
-                if minutes > 0:
-                    parts.append(f"{minutes}m")
-                if seconds > 0 and not parts:
-                    parts.append(f"{seconds}s")
-                return " ".join(parts) if parts else "0s"
-
-            thresholds = [
-                (60, "1min"),
-                (300, "5min"),
-                (600, "10min"),
-                (900, "15min"),
-                (1800, "30min"),
-            ]
-            for threshold, label in thresholds:
-                if remaining <= threshold and not data["announcements"][label]:
+                log.debug(
+                    "[%s] Max playtime: %s, Time remaining: %s",
+                    player, PLAY_LIMIT, timedelta(seconds=max(0, remaining)),
+                )
+
+            # Most players are nowhere near a warning, don't scan the thresholds for them
+            if remaining <= _MAX_THRESHOLD:
+                announced = data.get("announcements_mask", 0)
+                # Bits of the thresholds at or above remaining that haven't been announced yet.
+                # -(1 << k) has every bit from k upwards set
+                pending = _ALL_THRESHOLD_BITS & ~announced & -(1 << bisect_left(_THRESHOLD_SECONDS, remaining))
+                if pending:
+                    # Lowest pending bit is the smallest such threshold, same pick as scanning in order
+                    bit = pending & -pending
+                    # Only build the warning text once a threshold actually fires
+                    time_left = pretty_time(int(remaining))
+                    time_limit_text = f"{_BASE_HOURS}-hour limit" + (f" (+{rollover_time/3600:.1f}h rollover)" if rollover_time > 0 else "")
                     send_message(
                         None,
-                        f"{player} has {pretty_time(remaining)} left before reaching the {time_limit_text}!"
+                        f"{player} has {time_left} left before reaching the {time_limit_text}!"
                     )
-                    run_command(f"/title {player} title {{\"text\":\"{pretty_time(remaining)} Remaining!\",\"color\":\"red\",\"bold\":true}}")
-                    data["announcements"][label] = True
-                    break
+                    run_command(f"/title {player} title {{\"text\":\"{time_left} Remaining!\",\"color\":\"red\",\"bold\":true}}")
+                    data["announcements_mask"] = announced | bit
+                    mark_dirty()
 
             # Ban and reset - ensure playtime is never negative before checking
-            data["playtime"] = max(0, data["playtime"])
-            rollover_time = data.get("rollover_time", 0)
-            total_limit = PLAY_LIMIT.total_seconds() + rollover_time
-            if data["playtime"] >= total_limit and not data.get("banned", False):
-                base_hours = PLAY_LIMIT.total_seconds() // 3600
-                limit_msg = f"{base_hours}-hour"
+            if playtime < 0:
+                playtime = data["playtime"] = 0
+                mark_dirty()
+            if playtime >= total_limit and not data.get("banned", False):
+                limit_msg = f"{_BASE_HOURS}-hour"
                 if rollover_time > 0:
                     limit_msg += f" (+{rollover_time/3600:.1f}h rollover)"
                 send_message(None, f"{player} has reached the {limit_msg} playtime limit! See you tomorrow buddy")
                 run_command(f"/title {player} title {{\"text\":\"BYE BYE\",\"color\":\"red\",\"bold\":true}}")
                 run_command(f"ban {player} Reached playtime limit. Resets at midnight")
                 data["banned"] = True
-                data["session_start"] = dt_to_iso(now)
+                data["session_start"] = now_ts
                 data["playtime"] = 0
                 data["session_date"] = today_str
-                data["last_checked"] = dt_to_iso(now)  # Update last_checked to prevent phantom time
+                data["last_checked"] = now_ts  # Update last_checked to prevent phantom time
                 data["online"] = False
-                for k in data["announcements"]:
-                    data["announcements"][k] = False
+                data["announcements_mask"] = 0
+                mark_dirty()
+                log_event(player, "ban", now_ts)
 
-    save_sessions()
-    time.sleep(60)  # pause until next cycle
+    # Changes are flushed by autosave_loop and on shutdown rather than every cycle
+    return bool(online_set)
@@ -1,14 +1,36 @@
 import websocket
-import json
+import orjson
 import time
 import os
 from dotenv import load_dotenv
 from command_handler import CommandHandler
 
-load_dotenv()
 DEBUG_MODE = False
 SEND_READY_MESSAGE = True  # Set to False to disable ready message
 
+# Chat announcement sent once the console stream is up, it never changes so it's built once
+_READY_COMMAND = "tellraw @a " + orjson.dumps(
+    {
+        "text": "",
+        "extra": [
+            {"text": "[", "color": "gray"},
+            {"text": "ATTR", "color": "green", "bold": True},
+            {"text": "] ", "color": "gray"},
+            {"text": "Ready for commands! ", "color": "aqua"},
+            {"text": "Type ", "color": "white"},
+            {"text": "!help", "color": "yellow", "bold": True},
+            {"text": " for available commands.", "color": "white"}
+        ]
+    }
+).decode()
+_FALLBACK_READY = "say [ATTR] Ready for commands! Type !help for available commands."
+
+# exaroton server status names, indexed by status code
+STATUS_NAMES = (
+    "OFFLINE", "ONLINE", "STARTING", "STOPPING", "RESTARTING", "SAVING",
+    "LOADING", "CRASHED", "PENDING", "TRANSFERRING", "PREPARING",
+)
+
 class WebSocketConsoleMonitor:
     """Simple WebSocket monitor to print server console to stdout"""
 
@@ -27,7 +49,7 @@ class WebSocketConsoleMonitor:
     def on_message(self, ws, message):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             msg_type = data.get("type")
             stream = data.get("stream")
             msg_data = data.get("data")
@@ -76,12 +98,11 @@ class WebSocketConsoleMonitor:
                 if stream == "status" and msg_type == "status":
                     if msg_data:
                         status_code = msg_data.get("status", 0)
-                        status_names = {
-                            0: "OFFLINE", 1: "ONLINE", 2: "STARTING", 3: "STOPPING",
-                            4: "RESTARTING", 5: "SAVING", 6: "LOADING", 7: "CRASHED",
-                            8: "PENDING", 9: "TRANSFERRING", 10: "PREPARING"
-                        }
-                        status_name = status_names.get(status_code, "UNKNOWN")
+                        # The frame may carry null or a non-integer status
+                        if isinstance(status_code, int) and 0 <= status_code < len(STATUS_NAMES):
+                            status_name = STATUS_NAMES[status_code]
+                        else:
+                            status_name = "UNKNOWN"
                         print(f"[WS] Server status: {status_name}")
 
                 elif stream == "console":
@@ -100,7 +121,7 @@ class WebSocketConsoleMonitor:
                         if self.command_handler:
                             self.command_handler.process_console_line(msg_data)
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             print(f"[WS ERROR] Failed to parse message: {e}")
         except Exception as e:
             print(f"[WS ERROR] Error handling message: {e}")
@@ -132,19 +153,23 @@ class WebSocketConsoleMonitor:
                 "type": "start",
                 "data": {"tail": 50}  # Get last 50 lines
             }
-            self.ws.send(json.dumps(message))
+            self.ws.send(orjson.dumps(message).decode())
             print("[WS] Subscribing to console stream...")
 
     def send_command(self, command):
-        """Send a command to the server via console stream"""
+        """Send a command, or a list of commands, to the server via console stream"""
         if self.console_subscribed and self.ws:
-            message = {
-                "stream": "console",
-                "type": "command",
-                "data": command
-            }
-            self.ws.send(json.dumps(message))
-            print(f"[WS] Sent command: {command}")
+            commands = [command] if isinstance(command, str) else command
+            # The console protocol takes one command per message, so a batch
+            # goes out as back-to-back frames
+            for cmd in commands:
+                message = {
+                    "stream": "console",
+                    "type": "command",
+                    "data": cmd
+                }
+                self.ws.send(orjson.dumps(message).decode())
+                print(f"[WS] Sent command: {cmd}")
 
     def send_ready_message(self):
         """Send a ready for commands message to chat"""
@@ -154,27 +179,13 @@ class WebSocketConsoleMonitor:
 
         try:
             # Use tellraw for better formatting
-            tellraw_message = {
-                "text": "",
-                "extra": [
-                    {"text": "[", "color": "gray"},
-                    {"text": "ATTR", "color": "green", "bold": True},
-                    {"text": "] ", "color": "gray"},
-                    {"text": "Ready for commands! ", "color": "aqua"},
-                    {"text": "Type ", "color": "white"},
-                    {"text": "!help", "color": "yellow", "bold": True},
-                    {"text": " for available commands.", "color": "white"}
-                ]
-            }
-            ready_command = f"tellraw @a {json.dumps(tellraw_message)}"
-            self.send_command(ready_command)
+            self.send_command(_READY_COMMAND)
             print("[WS] Sent ready for commands message to chat")
         except Exception as e:
             print(f"[WS ERROR] Failed to send ready message: {e}")
             # Fallback to simple say command
             try:
-                fallback_command = "say [ATTR] Ready for commands! Type !help for available commands."
-                self.send_command(fallback_command)
+                self.send_command(_FALLBACK_READY)
                 print("[WS] Sent fallback ready message to chat")
             except Exception as e2:
                 print(f"[WS ERROR] Failed to send fallback ready message: {e2}")
@@ -266,13 +277,14 @@ def run_websocket_monitor(api_token, server_id):
         except Exception as e:
             print(f"[WS ERROR] Monitor error: {e}")
             attempt += 1
-            current_delay = min(base_delay * (2 ** attempt), max_delay)
+            current_delay = min(base_delay * (2 ** min(attempt, 10)), max_delay)
             print(f"[WS] Retrying connection in {current_delay} seconds (attempt #{attempt})...")
             time.sleep(current_delay)
 
 
 if __name__ == "__main__":
-    # Test standalone
+    # Test standalone. main.py loads .env itself and passes the token in
+    load_dotenv()
     API_TOKEN = os.environ.get("API_KEY")
     SERVER_ID = os.environ.get("SERVER_ID")  # You'll need to add this to .env or get it from main.py
 